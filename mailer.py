@@ -1,37 +1,446 @@
 import sys
 import os
+import glob
+import json
+import shutil
+import socket
+import getpass
+import tempfile
+import uuid
+import threading
+import multiprocessing
+import numpy as np
 import pandas as pd
 import smtplib
+import math
 import time
+import datetime
 import re
+import base64
+import binascii
+import hashlib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
+from email.mime.image import MIMEImage
 from email import encoders
 import urllib.parse 
+from html.parser import HTMLParser
 from email.header import Header
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QFileDialog, QComboBox, QTextEdit,
     QProgressBar, QMessageBox, QListWidget, QListWidgetItem, QGroupBox,
-    QSizePolicy, QFrame
+    QSizePolicy, QFrame, QCheckBox
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, QTimer, QFileSystemWatcher, pyqtSignal
 from PyQt5.QtXml import QDomDocument
 
 # --- Configuration ---
 SMTP_SERVER = 'smtp.gmail.com'
 SMTP_PORT = 587
+DEFAULT_SEND_RATE = 10.0 # Max messages per second for a whole campaign, across all connections
 
-# --- EmailSenderThread (No changes from the previous full code version) ---
+# --- Connection Probe ---
+PROBE_TRIALS = 3 # SMTP sessions opened by the test send to measure connect/TLS/AUTH latency
+MAX_CONNECTIONS = 8 # Upper bound for the recommended number of parallel connections
+SESSION_KEEPALIVE_MS = 60 * 1000 # NOOP interval that keeps the verified session warm until bulk send
+
+# --- Sharded Sending ---
+SHARDING_MIN_ROWS = 2000 # Sheets at least this large are sent by worker processes
+SHARD_PROCESSES = min(4, os.cpu_count() or 1)
+SHARD_ROWS = 5000
+SPOOL_DIR = os.environ.get("GSEND_SPOOL_DIR") # Shared directory other machines can join with --spool-worker
+SPOOL_WORKER_SLOTS_ENV = "GSEND_SPOOL_WORKER_SLOTS" # Total workers across machines; defaults to the local process count
+SPOOL_POLL_INTERVAL = 0.25
+SPOOL_HEARTBEAT_INTERVAL = 10 # Seconds between a worker's touches of its claimed shard and slot
+SPOOL_CLAIM_TIMEOUT = 300 # Claims not touched for this long are handed back, e.g. after a worker machine dies
+
+# --- Template Preprocessing ---
+MISSING_DATA = "[MISSING_DATA]"
+DATE_FORMAT = "%Y-%m-%d"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M"
+PLACEHOLDER_PATTERN = re.compile(r"\{\{(.*?)\}\}")
+MAX_EXACT_FLOAT_INT = 2 ** 53
+
+def compile_template(template_str, columns):
+    """
+    Splits a template into literal text and column slots once, so rendering a row
+    is a plain join instead of one regex pass per column.
+    Returns (literals, slots) where len(literals) == len(slots) + 1.
+    Placeholders that do not match a column are folded into the literals as [MISSING_DATA].
+    """
+    known_columns = set(str(col) for col in columns)
+    pieces = PLACEHOLDER_PATTERN.split(template_str)
+    literals = [pieces[0]]
+    slots = []
+    for i in range(1, len(pieces), 2):
+        col_name = pieces[i].strip()
+        if col_name in known_columns:
+            slots.append(col_name)
+            literals.append(pieces[i + 1])
+        else:
+            literals[-1] += MISSING_DATA + pieces[i + 1]
+    return literals, slots
+
+def format_cell(value):
+    """Formats one non-string cell of a mixed (object dtype) column with the same rules as format_column."""
+    if isinstance(value, datetime.datetime):
+        has_time = (value.hour, value.minute, value.second, value.microsecond) != (0, 0, 0, 0)
+        return value.strftime(DATETIME_FORMAT if has_time else DATE_FORMAT)
+    if isinstance(value, datetime.date):
+        return value.strftime(DATE_FORMAT)
+    if isinstance(value, float) and value.is_integer() and abs(value) < MAX_EXACT_FLOAT_INT:
+        return str(int(value))
+    return str(value)
+
+def format_column(series):
+    """Formats a whole column to display strings with vectorized ops; blanks become [MISSING_DATA]."""
+    blank = series.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        present = series[~blank]
+        has_time = bool((present != present.dt.normalize()).any())
+        formatted = series.dt.strftime(DATETIME_FORMAT if has_time else DATE_FORMAT).to_numpy(dtype=object)
+    elif pd.api.types.is_bool_dtype(series):
+        formatted = series.astype(str).to_numpy(dtype=object)
+    elif pd.api.types.is_float_dtype(series):
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        formatted = series.astype(str).to_numpy(dtype=object)
+        with np.errstate(invalid='ignore'):
+            integral = ~blank & (np.mod(values, 1) == 0) & (np.abs(values) < MAX_EXACT_FLOAT_INT)
+        formatted[integral] = values[integral].astype(np.int64).astype(str).astype(object)
+    else:
+        formatted = series.astype(str).to_numpy(dtype=object)
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            blank = blank | (series.astype(str).str.strip() == "").to_numpy()
+        if pd.api.types.is_object_dtype(series):
+            # read_excel gives object dtype when a column mixes types (e.g. dates and "TBD")
+            values = series.to_numpy(dtype=object)
+            non_string = ~blank & np.fromiter((not isinstance(value, str) for value in values), dtype=bool, count=len(values))
+            if non_string.any():
+                formatted[non_string] = [format_cell(value) for value in values[non_string]]
+    formatted[blank] = MISSING_DATA
+    return formatted
+
+def prepare_template_columns(df, compiled_templates):
+    """Formats only the columns referenced by the compiled templates, once per sheet."""
+    used_columns = []
+    for _, slots in compiled_templates:
+        for col_name in slots:
+            if col_name not in used_columns:
+                used_columns.append(col_name)
+    column_lookup = {str(col): col for col in df.columns}
+    return {col_name: format_column(df[column_lookup[col_name]]) for col_name in used_columns}
+
+# --- Plain-Text Alternative ---
+BLOCK_TAGS = {"p", "div", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "table", "tr", "blockquote", "pre", "hr"}
+SKIPPED_TAGS = {"head", "style", "script", "title"}
+PRE_MARKER = "\x00" # Brackets <pre> text in parts so get_text() leaves its whitespace alone
+ZERO_MARGIN_PATTERN = r"margin-{}\s*:\s*0(?:px)?\s*(?:;|$)"
+
+class HTMLToTextConverter(HTMLParser):
+    """Converts an HTML body template to plain text, leaving {{ Placeholder }} slots in place."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skip_depth = 0
+        self.pre_depth = 0
+        self.pre_start = False # Next <pre> data follows the start tag, whose first newline HTML drops
+        self.link_stack = []
+        self.block_stack = [] # Whether each open block is followed by a blank line
+
+    def preceding_text(self, ignored=PRE_MARKER):
+        return next((part for part in reversed(self.parts) if part.strip(ignored)), "").rstrip(ignored)
+
+    def block_break(self, spaced):
+        # QTextEdit.toHtml() writes each typed line as a zero-margin <p>, which reads as a line break
+        if spaced:
+            self.parts.append("\n\n")
+        else:
+            preceding = self.preceding_text(" " + PRE_MARKER) # Skips the whitespace between tags
+            if preceding and not preceding.endswith("\n"):
+                self.parts.append("\n")
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag == "br":
+            self.parts.append("\n")
+        elif tag == "li":
+            self.parts.append("\n- ")
+        elif tag in ("td", "th"):
+            self.parts.append("\t")
+        elif tag == "img" and attrs.get("alt"):
+            preceding = self.preceding_text()
+            spacer = " " if preceding and not preceding[-1].isspace() else "" # e.g. "link (url) [logo]"
+            self.parts.append(f"{spacer}[{attrs['alt']}]")
+        elif tag == "a":
+            self.link_stack.append((attrs.get("href") or "", len(self.parts)))
+        elif tag in BLOCK_TAGS:
+            style = attrs.get("style") or ""
+            self.block_break(not re.search(ZERO_MARGIN_PATTERN.format("top"), style))
+            self.block_stack.append(not re.search(ZERO_MARGIN_PATTERN.format("bottom"), style))
+        if tag == "pre":
+            self.pre_depth += 1
+            self.pre_start = True
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag == "a" and self.link_stack:
+            href, start = self.link_stack.pop()
+            link_text = "".join(self.parts[start:]).strip()
+            if href and not href.startswith(("#", "mailto:", "cid:")) and href != link_text:
+                self.parts.append(f" ({href})")
+        elif tag in BLOCK_TAGS:
+            self.block_break(self.block_stack.pop() if self.block_stack else True)
+        if tag == "pre":
+            self.pre_depth = max(0, self.pre_depth - 1)
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if not self.pre_depth:
+            self.parts.append(re.sub(r"\s+", " ", data))
+            return
+        if self.pre_start and data.startswith("\n"):
+            data = data[1:]
+        self.pre_start = False
+        self.parts.append(f"{PRE_MARKER}{data}{PRE_MARKER}")
+
+    def get_text(self):
+        segments = "".join(self.parts).split(PRE_MARKER)
+        for i in range(0, len(segments), 2): # Odd segments are <pre> text and keep their layout
+            flowing = re.sub(r" *\n *", "\n", segments[i])
+            segments[i] = re.sub(r"\n{3,}", "\n\n", flowing)
+        segments[0] = segments[0].lstrip()
+        return "".join(segments).rstrip() + "\n"
+
+def html_to_text(html):
+    converter = HTMLToTextConverter()
+    converter.feed(html)
+    converter.close()
+    return converter.get_text()
+
+# --- Send History ---
+SEND_HISTORY_SUFFIX = ".gsend-history" # Stored next to the workbook: one row hash per sent row
+WATCH_DEBOUNCE_MS = 1500 # Wait for the workbook to settle before reloading it
+
+def read_recipient_sheet(file_path):
+    df = pd.read_excel(file_path)
+    df.columns = [str(col).strip() for col in df.columns]
+    return df
+
+def row_content_hashes(df):
+    """
+    Hashes each row's formatted cell values, so a reload that changes a column's dtype
+    (e.g. int to float after a blank is added) keeps the hashes of unchanged rows.
+    """
+    formatted = pd.DataFrame({str(col): format_column(df[col]) for col in df.columns}, index=df.index)
+    return pd.util.hash_pandas_object(formatted, index=False)
+
+def send_history_path(file_path):
+    return file_path + SEND_HISTORY_SUFFIX
+
+def load_send_history(file_path):
+    history_path = send_history_path(file_path)
+    if not os.path.exists(history_path):
+        return set()
+    with open(history_path, encoding="ascii") as history_file:
+        return {int(line, 16) for line in history_file if line.strip()}
+
+def append_send_history(file_path, row_hashes):
+    with open(send_history_path(file_path), "a", encoding="ascii") as history_file:
+        history_file.writelines(f"{int(row_hash):016x}\n" for row_hash in row_hashes)
+
+# --- Inline Images ---
+DATA_URI_IMAGE_PATTERN = re.compile(r"""(src\s*=\s*)(["'])data:image/([\w.+-]+);base64,([A-Za-z0-9+/=\s]+)\2""", re.IGNORECASE)
+
+def extract_inline_images(body_template_html):
+    """
+    Replaces base64 data: URI images with cid: references, decoding and encoding each distinct
+    image once. Returns (html, image_parts); the MIMEImage parts are shared by every message.
+    """
+    image_parts = []
+    content_ids = {}
+
+    def to_content_id(match):
+        try:
+            image_bytes = base64.b64decode(re.sub(r"\s+", "", match.group(4)), validate=True)
+        except (binascii.Error, ValueError):
+            return match.group(0) # Leave malformed data: URIs untouched
+        digest = hashlib.sha1(image_bytes).hexdigest()
+        if digest not in content_ids:
+            subtype = match.group(3).lower()
+            content_ids[digest] = f"img-{digest[:16]}@gsend"
+            part = MIMEImage(image_bytes, _subtype=subtype)
+            part.add_header('Content-ID', f"<{content_ids[digest]}>")
+            part.add_header('Content-Disposition', 'inline', filename=f"image{len(image_parts) + 1}.{subtype.split('+')[0]}")
+            image_parts.append(part)
+        quote = match.group(2)
+        return f"{match.group(1)}{quote}cid:{content_ids[digest]}{quote}"
+
+    return DATA_URI_IMAGE_PATTERN.sub(to_content_id, body_template_html), image_parts
+
+# --- SMTP Transport ---
+CHUNKING_THRESHOLD = 64 * 1024 # Messages at least this large are sent with BDAT when CHUNKING is offered
+BDAT_CHUNK_SIZE = 1024 * 1024
+CRLF = b"\r\n"
+
+def message_to_smtp_bytes(msg):
+    """
+    Serializes a message with its own compat32 policy, which RFC 2047-encodes non-ASCII
+    headers, and normalizes line endings to the CRLF that DATA and BDAT expect.
+    """
+    return re.sub(rb"\r\n|\r|\n", b"\r\n", msg.as_bytes())
+
+class PipeliningSMTP(smtplib.SMTP):
+    """
+    smtplib.SMTP that sends MAIL FROM, RCPT TO and DATA in a single round trip when the
+    server advertises PIPELINING (RFC 2920), and streams large messages as BDAT chunks
+    without dot-stuffing when it also advertises CHUNKING (RFC 3030).
+    Servers without PIPELINING get the regular sendmail() exchange.
+    """
+
+    def send_message_bytes(self, from_addr, to_addrs, msg_bytes):
+        if isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+        self.ehlo_or_helo_if_needed()
+        if not self.has_extn('pipelining'):
+            return self.sendmail(from_addr, to_addrs, msg_bytes)
+
+        use_bdat = self.has_extn('chunking') and len(msg_bytes) >= CHUNKING_THRESHOLD
+        commands = [f"MAIL FROM:{smtplib.quoteaddr(from_addr)}"]
+        commands += [f"RCPT TO:{smtplib.quoteaddr(addr)}" for addr in to_addrs]
+        if not use_bdat:
+            commands.append("DATA")
+        self.send("".join(cmd + "\r\n" for cmd in commands).encode('ascii'))
+
+        chunk_count = 0
+        if use_bdat:
+            for offset in range(0, len(msg_bytes), BDAT_CHUNK_SIZE):
+                chunk = msg_bytes[offset:offset + BDAT_CHUNK_SIZE]
+                last = offset + BDAT_CHUNK_SIZE >= len(msg_bytes)
+                self.send(f"BDAT {len(chunk)}{' LAST' if last else ''}\r\n".encode('ascii') + chunk)
+                chunk_count += 1
+
+        mail_code, mail_resp = self.getreply()
+        rcpt_errors = {}
+        for addr in to_addrs:
+            code, resp = self.getreply()
+            if code not in (250, 251):
+                rcpt_errors[addr] = (code, resp)
+        envelope_ok = mail_code == 250 and len(rcpt_errors) < len(to_addrs)
+
+        if use_bdat:
+            data_code, data_resp = 250, b""
+            for _ in range(chunk_count):
+                code, resp = self.getreply()
+                if data_code == 250 and code != 250:
+                    data_code, data_resp = code, resp
+        else:
+            data_code, data_resp = self.getreply()
+            if data_code == 354:
+                # RFC 2920 3.1: if the envelope was rejected the client still has to end the DATA phase.
+                body = re.sub(rb"(?m)^\.", b"..", msg_bytes) if envelope_ok else b""
+                if body and not body.endswith(CRLF):
+                    body += CRLF
+                self.send(body + b"." + CRLF)
+                data_code, data_resp = self.getreply()
+
+        if mail_code != 250:
+            self._reset_after_failure(mail_code)
+            raise smtplib.SMTPSenderRefused(mail_code, mail_resp, from_addr)
+        if len(rcpt_errors) == len(to_addrs):
+            self._reset_after_failure(data_code)
+            raise smtplib.SMTPRecipientsRefused(rcpt_errors)
+        if data_code != 250:
+            self._reset_after_failure(data_code)
+            raise smtplib.SMTPDataError(data_code, data_resp)
+        return rcpt_errors
+
+    def _reset_after_failure(self, code):
+        if code == 421:
+            self.close()
+            return
+        try:
+            self.rset()
+        except smtplib.SMTPServerDisconnected:
+            pass
+
+def open_smtp_session(sender_email, app_password):
+    """Connects, upgrades to TLS and logs in. Returns (server, timings) with each step's duration in seconds."""
+    timings = {}
+    server = PipeliningSMTP()
+    try:
+        step_start = time.perf_counter()
+        server.connect(SMTP_SERVER, SMTP_PORT)
+        timings["connect"] = time.perf_counter() - step_start
+        server.ehlo()
+        step_start = time.perf_counter()
+        server.starttls()
+        timings["tls"] = time.perf_counter() - step_start
+        server.ehlo()
+        step_start = time.perf_counter()
+        server.login(sender_email, app_password)
+        timings["auth"] = time.perf_counter() - step_start
+    except Exception:
+        server.close()
+        raise
+    return server, timings
+
+def close_smtp_session(server):
+    if server is None:
+        return
+    try:
+        server.quit()
+    except Exception:
+        server.close()
+
+def measure_round_trip(server, samples=3):
+    durations = []
+    for _ in range(samples):
+        step_start = time.perf_counter()
+        server.noop()
+        durations.append(time.perf_counter() - step_start)
+    return min(durations)
+
+def estimate_message_seconds(probe):
+    """
+    Time one connection needs per message: the measured send time of the test email when
+    there is one, otherwise the round trips a send costs (2 with PIPELINING: envelope + body;
+    4 without: MAIL, RCPT, DATA, body) times the measured NOOP round trip.
+    """
+    if probe.get("message"):
+        return probe["message"]
+    return probe["round_trip"] * (2 if probe.get("pipelining", True) else 4)
+
+def recommend_send_settings(probe, max_rate=DEFAULT_SEND_RATE, max_connections=MAX_CONNECTIONS):
+    """
+    Sizes concurrency from the probe: one connection completes a message every
+    estimate_message_seconds(probe), so reaching max_rate needs max_rate * message_time connections.
+    Shared by the app's test send and test-email.py so both recommend the same settings.
+    """
+    message_seconds = estimate_message_seconds(probe)
+    per_connection_rate = 1.0 / max(message_seconds, 1e-3)
+    connections = int(np.clip(np.ceil(max_rate / per_connection_rate), 1, max_connections))
+    return {"connections": connections, "send_rate": round(min(max_rate, connections * per_connection_rate), 2)}
+
+# --- EmailSenderThread ---
 class EmailSenderThread(QThread):
     progress_update = pyqtSignal(int, int, int, str, str)
     finished_signal = pyqtSignal(list)
     log_signal = pyqtSignal(str, str)
+    row_result = pyqtSignal(object, str, str, object) # original index, recipient, error ("" when sent), row hash or None
+    probe_signal = pyqtSignal(dict)
 
     def __init__(self, df_batch, email_column, sender_email, app_password,
-                 subject_template, body_template_html, attachment_paths=None, parent=None):
+                 subject_template, body_template_html, attachment_paths=None,
+                 send_rate=DEFAULT_SEND_RATE, server=None, keep_session=False,
+                 probe_trials=0, row_hashes=None, parent=None):
         super().__init__(parent)
         self.df_batch = df_batch 
         self.email_column = email_column
@@ -40,18 +449,69 @@ class EmailSenderThread(QThread):
         self.subject_template = subject_template
         self.body_template_html = body_template_html 
         self.attachment_paths = attachment_paths if attachment_paths else []
+        self.send_rate = send_rate
+        self.server = server # Already authenticated session to reuse, if still alive
+        self.keep_session = keep_session # Leave self.server open after run() for the next batch
+        self.probe_trials = probe_trials
+        self.row_hashes = row_hashes # Content hash per df_batch row, echoed back through row_result
         self.is_running = True
         self.batch_failed_data = []
+        self._next_send_time = 0.0
+        self._queue_lock = threading.Lock()
+        self._queued_batches = [] # Rows added by enqueue_rows() while running
+        self._accepting_rows = True
 
-    def _render_template(self, template_str, row_data):
-        new_template_str = template_str
-        for col_name_from_excel, value in row_data.items():
-            escaped_col_name = re.escape(str(col_name_from_excel))
-            str_value = str(value)
-            pattern = r"\{\{\s*" + escaped_col_name + r"\s*\}\}"
-            new_template_str = re.sub(pattern, str_value, new_template_str)
-        new_template_str = re.sub(r"\{\{.*?\}\}", "[MISSING_DATA]", new_template_str)
-        return new_template_str
+    def enqueue_rows(self, df_rows, row_hashes=None):
+        """Appends rows to a running send. Returns False once the thread has stopped taking new rows."""
+        with self._queue_lock:
+            if not self._accepting_rows or not self.is_running:
+                return False
+            self._queued_batches.append((df_rows, row_hashes))
+            return True
+
+    def take_queued_rows(self):
+        """Stops accepting rows and returns the (rows, row_hashes) batches that were never sent."""
+        with self._queue_lock:
+            self._accepting_rows = False
+            leftover, self._queued_batches = self._queued_batches, []
+        return leftover
+
+    def _next_queued_batch(self):
+        with self._queue_lock:
+            if self._queued_batches and self.is_running:
+                return self._queued_batches.pop(0)
+            self._accepting_rows = False
+            return None, None
+
+    def _wait_for_send_slot(self):
+        if not self.send_rate or self.send_rate <= 0:
+            return
+        now = time.monotonic()
+        if self._next_send_time > now:
+            time.sleep(self._next_send_time - now)
+            now = self._next_send_time
+        self._next_send_time = now + 1.0 / self.send_rate
+
+    def _reuse_warm_session(self):
+        if self.server is None:
+            return None
+        try:
+            if self.server.noop()[0] == 250:
+                return self.server
+        except (smtplib.SMTPException, OSError):
+            pass
+        self.server.close()
+        self.server = None
+        self.log_signal.emit("Warm SMTP session expired. Reconnecting.", "info")
+        return None
+
+    def _render_template(self, compiled_template, formatted_columns, position):
+        literals, slots = compiled_template
+        parts = [literals[0]]
+        for col_name, literal in zip(slots, literals[1:]):
+            parts.append(formatted_columns[col_name][position])
+            parts.append(literal)
+        return "".join(parts)
 
     def run(self):
         sent_count = 0
@@ -60,12 +520,18 @@ class EmailSenderThread(QThread):
         self.batch_failed_data = []
         start_time = time.time()
 
+        session_timings = []
+        message_durations = []
         try:
-            server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-            server.ehlo()
-            server.starttls()
-            server.ehlo()
-            server.login(self.sender_email, self.app_password)
+            server = self._reuse_warm_session()
+            if server is None:
+                server, timings = open_smtp_session(self.sender_email, self.app_password)
+                session_timings.append(timings)
+                self.server = server
+            for _ in range(self.probe_trials - len(session_timings)):
+                trial_server, timings = open_smtp_session(self.sender_email, self.app_password)
+                session_timings.append(timings)
+                close_smtp_session(trial_server)
         except smtplib.SMTPAuthenticationError:
             auth_fail_msg = "Gmail Authentication Failed. Check email/app password."
             self.log_signal.emit(auth_fail_msg, "error")
@@ -79,82 +545,127 @@ class EmailSenderThread(QThread):
             self.finished_signal.emit([(-1, "N/A", conn_err_msg)])
             return
 
-        for original_df_index, row in self.df_batch.iterrows():
-            if not self.is_running:
-                break
+        body_template_html, inline_images = extract_inline_images(self.body_template_html)
+        if inline_images:
+            self.log_signal.emit(f"Embedded {len(inline_images)} inline image(s) as shared attachments.", "info")
+        body_template_text = html_to_text(body_template_html) # Converted once; rows only fill its slots
+        batch, batch_hashes = self.df_batch, self.row_hashes
+        while batch is not None:
+            compiled_subject = compile_template(self.subject_template, batch.columns)
+            compiled_body = compile_template(body_template_html, batch.columns)
+            compiled_text = compile_template(body_template_text, batch.columns)
+            formatted_columns = prepare_template_columns(batch, [compiled_subject, compiled_body, compiled_text])
+            if self.email_column in batch.columns:
+                recipient_emails = batch[self.email_column].fillna("").astype(str).str.strip().to_numpy(dtype=object)
+            else:
+                recipient_emails = np.full(len(batch), "", dtype=object)
+
+            for position, original_df_index in enumerate(batch.index):
+                if not self.is_running:
+                    break
             
-            recipient_email = str(row.get(self.email_column, "")).strip()
-            email_error_details = []
+                recipient_email = recipient_emails[position]
+                row_hash = int(batch_hashes.iloc[position]) if batch_hashes is not None else None
+                email_error_details = []
 
-            if not recipient_email or "@" not in recipient_email:
-                failed_count += 1
-                self.batch_failed_data.append((original_df_index, recipient_email, "Invalid or missing email address in sheet"))
-                self.progress_update.emit(sent_count, failed_count, total_emails, recipient_email, self._calculate_eta(start_time, sent_count + failed_count, total_emails))
-                continue
+                if not recipient_email or "@" not in recipient_email:
+                    failed_count += 1
+                    self.batch_failed_data.append((original_df_index, recipient_email, "Invalid or missing email address in sheet"))
+                    self.row_result.emit(original_df_index, recipient_email, "Invalid or missing email address in sheet", row_hash)
+                    self.progress_update.emit(sent_count, failed_count, total_emails, recipient_email, self._calculate_eta(start_time, sent_count + failed_count, total_emails))
+                    continue
 
-            try:
-                current_subject = self._render_template(self.subject_template, row)
-                current_body_html = self._render_template(self.body_template_html, row)
-
-                msg = MIMEMultipart()
-                msg['From'] = self.sender_email
-                msg['To'] = recipient_email
-                msg['Subject'] = current_subject
-                msg.attach(MIMEText(current_body_html, 'html', 'utf-8'))
-
-                for path in self.attachment_paths:
-                    if not os.path.exists(path):
-                        attach_warn = f"Attachment not found: {os.path.basename(path)} for {recipient_email}"
-                        self.log_signal.emit(attach_warn, "warning")
-                        email_error_details.append(f"Skipped: {os.path.basename(path)}")
-                        continue
+                try:
+                    current_subject = self._render_template(compiled_subject, formatted_columns, position)
+                    current_body_html = self._render_template(compiled_body, formatted_columns, position)
+                    current_body_text = self._render_template(compiled_text, formatted_columns, position)
+
+                    msg = MIMEMultipart()
+                    msg['From'] = self.sender_email
+                    msg['To'] = recipient_email
+                    msg['Subject'] = current_subject
+                    alternative = MIMEMultipart('alternative')
+                    alternative.attach(MIMEText(current_body_text, 'plain', 'utf-8'))
+                    if inline_images:
+                        related = MIMEMultipart('related', type='text/html')
+                        related.attach(MIMEText(current_body_html, 'html', 'utf-8'))
+                        for image_part in inline_images:
+                            related.attach(image_part)
+                        alternative.attach(related)
+                    else:
+                        alternative.attach(MIMEText(current_body_html, 'html', 'utf-8'))
+                    msg.attach(alternative)
+
+                    for path in self.attachment_paths:
+                        if not os.path.exists(path):
+                            attach_warn = f"Attachment not found: {os.path.basename(path)} for {recipient_email}"
+                            self.log_signal.emit(attach_warn, "warning")
+                            email_error_details.append(f"Skipped: {os.path.basename(path)}")
+                            continue
                     
-                    filename_unicode = os.path.basename(path)
-                    try:
-                        with open(path, "rb") as attachment_file:
-                            part = MIMEBase("application", "octet-stream")
-                            part.set_payload(attachment_file.read())
-                        encoders.encode_base64(part)
-                        
+                        filename_unicode = os.path.basename(path)
                         try:
-                            h = Header(filename_unicode, 'utf-8')
-                            filename_param_value = h.encode()
-                        except Exception:
-                            filename_param_value = filename_unicode.encode('ascii', 'replace').decode('ascii').replace('"', '_')
-                            if not filename_param_value.strip() or filename_param_value == '?' * len(filename_unicode):
-                                _, ext = os.path.splitext(filename_unicode)
-                                filename_param_value = f"attachment{ext if ext else '.dat'}"
+                            with open(path, "rb") as attachment_file:
+                                part = MIMEBase("application", "octet-stream")
+                                part.set_payload(attachment_file.read())
+                            encoders.encode_base64(part)
+                        
+                            try:
+                                h = Header(filename_unicode, 'utf-8')
+                                filename_param_value = h.encode()
+                            except Exception:
+                                filename_param_value = filename_unicode.encode('ascii', 'replace').decode('ascii').replace('"', '_')
+                                if not filename_param_value.strip() or filename_param_value == '?' * len(filename_unicode):
+                                    _, ext = os.path.splitext(filename_unicode)
+                                    filename_param_value = f"attachment{ext if ext else '.dat'}"
                         
-                        filename_star_value = f"UTF-8''{urllib.parse.quote(filename_unicode, encoding='utf-8')}"
-                        part.add_header('Content-Disposition', 
-                                        'attachment', 
-                                        filename=filename_param_value,
-                                        **{'filename*': filename_star_value})
-                        msg.attach(part)
-                    except Exception as e_attach:
-                        attach_err = f"Failed to attach '{filename_unicode}' for {recipient_email}: {e_attach}"
-                        self.log_signal.emit(attach_err, "warning")
-                        email_error_details.append(f"Failed attach: {filename_unicode}")
+                            filename_star_value = f"UTF-8''{urllib.parse.quote(filename_unicode, encoding='utf-8')}"
+                            part.add_header('Content-Disposition', 
+                                            'attachment', 
+                                            filename=filename_param_value,
+                                            **{'filename*': filename_star_value})
+                            msg.attach(part)
+                        except Exception as e_attach:
+                            attach_err = f"Failed to attach '{filename_unicode}' for {recipient_email}: {e_attach}"
+                            self.log_signal.emit(attach_err, "warning")
+                            email_error_details.append(f"Failed attach: {filename_unicode}")
                 
-                server.sendmail(self.sender_email, recipient_email, msg.as_string())
-                sent_count += 1
-                log_status = recipient_email
-                if email_error_details: log_status += f" (attach issues: {', '.join(email_error_details)})"
-                self.progress_update.emit(sent_count, failed_count, total_emails, log_status, self._calculate_eta(start_time, sent_count + failed_count, total_emails))
+                    self._wait_for_send_slot()
+                    send_start = time.perf_counter()
+                    server.send_message_bytes(self.sender_email, recipient_email, message_to_smtp_bytes(msg))
+                    message_durations.append(time.perf_counter() - send_start)
+                    sent_count += 1
+                    self.row_result.emit(original_df_index, recipient_email, "", row_hash)
+                    log_status = recipient_email
+                    if email_error_details: log_status += f" (attach issues: {', '.join(email_error_details)})"
+                    self.progress_update.emit(sent_count, failed_count, total_emails, log_status, self._calculate_eta(start_time, sent_count + failed_count, total_emails))
 
+                except Exception as e:
+                    failed_count += 1
+                    error_message = str(e)
+                    if email_error_details: error_message += f" (Attach issues: {', '.join(email_error_details)})"
+                    self.batch_failed_data.append((original_df_index, recipient_email, error_message))
+                    self.row_result.emit(original_df_index, recipient_email, error_message, row_hash)
+                    self.progress_update.emit(sent_count, failed_count, total_emails, f"{recipient_email} (Failed: {error_message[:30]}...)", self._calculate_eta(start_time, sent_count + failed_count, total_emails))
+
+            batch, batch_hashes = self._next_queued_batch()
+            if batch is not None:
+                total_emails += len(batch)
+
+        if self.probe_trials and session_timings:
+            try:
+                probe = {step: float(np.mean([timings[step] for timings in session_timings])) for step in ("connect", "tls", "auth")}
+                probe["round_trip"] = measure_round_trip(server)
+                probe["pipelining"] = server.has_extn('pipelining')
+                probe["message"] = float(np.mean(message_durations)) if message_durations else None
+                probe.update(recommend_send_settings(probe))
+                self.probe_signal.emit(probe)
             except Exception as e:
-                failed_count += 1
-                error_message = str(e)
-                if email_error_details: error_message += f" (Attach issues: {', '.join(email_error_details)})"
-                self.batch_failed_data.append((original_df_index, recipient_email, error_message))
-                self.progress_update.emit(sent_count, failed_count, total_emails, f"{recipient_email} (Failed: {error_message[:30]}...)", self._calculate_eta(start_time, sent_count + failed_count, total_emails))
-            
-            time.sleep(0.1)
+                self.log_signal.emit(f"Connection probe incomplete: {e}", "warning")
 
-        try:
-            server.quit()
-        except Exception:
-            pass
+        if not self.keep_session or not self.is_running:
+            close_smtp_session(server)
+            self.server = None
         self.finished_signal.emit(self.batch_failed_data)
 
     def _calculate_eta(self, start_time, processed_count, total_count):
@@ -172,6 +683,347 @@ class EmailSenderThread(QThread):
     def stop(self):
         self.is_running = False
 
+# --- Spool Directory ---
+# A campaign spool holds campaign.json, one DataFrame per shard as table-oriented JSON
+# (shard-<campaign id>-NNNN.json), and per-shard event logs. Workers on any machine that can
+# see the directory claim a worker slot (and with it an equal share of the campaign send rate),
+# then claim shards by renaming them to .claimed. Progress is appended to <shard>.events.jsonl
+# and a <shard>.done marker is written once its events are complete. STOP-<campaign id> ends
+# the campaign's workers. Shards, slots and STOP carry the campaign id from campaign.json, so a
+# worker still running an earlier campaign never picks up a later campaign's shards.
+# Workers keep touching their claimed shard and slot; the app renames claims that go stale back
+# to .json so another worker resumes the shard after the rows its events already cover.
+
+def _shard_to_json(df_shard, shard_path):
+    # JSON, not pickle: the spool may be a shared directory, and unpickling a file from it would run its code.
+    # The table schema keeps column dtypes; dates inside mixed columns have no JSON type, so they are formatted here.
+    df_shard = df_shard.copy()
+    for col in df_shard.columns[df_shard.dtypes == object]:
+        df_shard[col] = df_shard[col].map(lambda value: format_cell(value) if isinstance(value, datetime.date) else value)
+    df_shard.to_json(shard_path, orient="table")
+
+def spool_worker_slots():
+    """Reads GSEND_SPOOL_WORKER_SLOTS. Returns None when unset; raises ValueError for anything but a positive integer."""
+    value = os.environ.get(SPOOL_WORKER_SLOTS_ENV, "").strip()
+    if not value:
+        return None
+    worker_slots = int(value)
+    if worker_slots < 1:
+        raise ValueError(f"expected a positive number of workers, got {worker_slots}")
+    return worker_slots
+
+def new_campaign_id():
+    return uuid.uuid4().hex[:12]
+
+def spool_stop_path(spool_dir, campaign_id):
+    return os.path.join(spool_dir, f"STOP-{campaign_id}")
+
+def write_campaign_spool(spool_dir, df, campaign, shard_rows=SHARD_ROWS):
+    """Writes campaign.json and then the shards of campaign["campaign_id"], replacing any earlier campaign."""
+    os.makedirs(spool_dir, exist_ok=True)
+    campaign_path = os.path.join(spool_dir, "campaign.json")
+    try:
+        with open(campaign_path, encoding="utf-8") as campaign_file:
+            previous_id = json.load(campaign_file).get("campaign_id")
+    except (OSError, ValueError):
+        previous_id = None
+    # Worker slots are cleared too: workers killed with the app never release theirs
+    stale_paths = (glob.glob(os.path.join(spool_dir, "shard-*")) + glob.glob(os.path.join(spool_dir, "worker-slot-*"))
+                   + glob.glob(os.path.join(spool_dir, "STOP*")))
+    for stale_path in stale_paths:
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+    if previous_id:
+        open(spool_stop_path(spool_dir, previous_id), "w").close() # Workers still on the old campaign stop
+    # campaign.json goes first, and atomically, so a worker never sees shards without their campaign
+    with open(campaign_path + ".tmp", "w", encoding="utf-8") as campaign_file:
+        json.dump(campaign, campaign_file)
+    os.replace(campaign_path + ".tmp", campaign_path)
+    shard_names = []
+    for shard_id, start in enumerate(range(0, len(df), shard_rows)):
+        shard_name = f"shard-{campaign['campaign_id']}-{shard_id:04d}"
+        _shard_to_json(df.iloc[start:start + shard_rows], os.path.join(spool_dir, shard_name + ".json"))
+        shard_names.append(shard_name)
+    return shard_names
+
+def _claim_worker_slot(spool_dir, campaign_id, worker_slots):
+    for slot in range(worker_slots):
+        slot_path = os.path.join(spool_dir, f"worker-slot-{campaign_id}-{slot}")
+        try:
+            fd = os.open(slot_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            continue
+        os.write(fd, f"{socket.gethostname()} {os.getpid()}".encode("utf-8"))
+        os.close(fd)
+        return slot_path
+    return None
+
+def _claim_next_shard(spool_dir, campaign_id):
+    for pending_path in sorted(glob.glob(os.path.join(spool_dir, f"shard-{campaign_id}-*.json"))):
+        shard_name = os.path.basename(pending_path)[:-len(".json")]
+        try:
+            os.rename(pending_path, os.path.join(spool_dir, shard_name + ".claimed"))
+        except OSError:
+            continue # Another worker claimed it first
+        return shard_name
+    return None
+
+def release_stale_claims(spool_dir, campaign_id, timeout=SPOOL_CLAIM_TIMEOUT):
+    """Hands claimed shards and worker slots whose heartbeat stopped back to the spool. Returns the released shard names."""
+    now = time.time()
+    released = []
+    for claimed_path in sorted(glob.glob(os.path.join(spool_dir, f"shard-{campaign_id}-*.claimed"))):
+        shard_name = os.path.basename(claimed_path)[:-len(".claimed")]
+        try:
+            if os.path.exists(os.path.join(spool_dir, shard_name + ".done")) or now - os.path.getmtime(claimed_path) < timeout:
+                continue
+            os.rename(claimed_path, os.path.join(spool_dir, shard_name + ".json"))
+        except OSError:
+            continue # Finished, touched or released by someone else in the meantime
+        released.append(shard_name)
+    for slot_path in glob.glob(os.path.join(spool_dir, f"worker-slot-{campaign_id}-*")):
+        try:
+            if now - os.path.getmtime(slot_path) >= timeout:
+                os.remove(slot_path)
+        except OSError:
+            pass
+    return released
+
+def _reported_indices(events_path):
+    """Row indices a shard's events already cover. Drops a partial last line left by a worker that died mid-write."""
+    if not os.path.exists(events_path):
+        return set()
+    with open(events_path, "r+b") as events_file:
+        data = events_file.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        if len(complete) != len(data):
+            events_file.truncate(len(complete))
+    events = [json.loads(line) for line in complete.decode("utf-8").splitlines() if line.strip()]
+    return {event["index"] for event in events if event["event"] in ("sent", "failed") and event["index"] != -1}
+
+def _send_spool_shard(spool_dir, shard_name, campaign, app_password, send_rate, server=None, slot_path=None):
+    stop_path = spool_stop_path(spool_dir, campaign["campaign_id"])
+    claimed_path = os.path.join(spool_dir, shard_name + ".claimed")
+    events_path = os.path.join(spool_dir, shard_name + ".events.jsonl")
+    df_shard = pd.read_json(claimed_path, orient="table")
+    df_shard = df_shard[~df_shard.index.isin(_reported_indices(events_path))] # Resuming a released shard
+    fatal_errors = []
+    last_heartbeat = 0.0
+
+    def heartbeat():
+        nonlocal last_heartbeat
+        if time.monotonic() - last_heartbeat < SPOOL_HEARTBEAT_INTERVAL:
+            return
+        last_heartbeat = time.monotonic()
+        for path in (claimed_path, slot_path):
+            try:
+                if path:
+                    os.utime(path)
+            except OSError:
+                pass
+
+    heartbeat()
+    with open(events_path, "a", encoding="utf-8") as events_file:
+        def write_event(**event):
+            events_file.write(json.dumps(event, default=str) + "\n")
+            events_file.flush()
+
+        sender = EmailSenderThread(
+            df_batch=df_shard,
+            email_column=campaign["email_column"],
+            sender_email=campaign["sender_email"],
+            app_password=app_password,
+            subject_template=campaign["subject_template"],
+            body_template_html=campaign["body_template_html"],
+            attachment_paths=campaign["attachment_paths"],
+            send_rate=send_rate,
+            server=server,
+            keep_session=True
+        )
+
+        def on_row_result(original_df_index, recipient_email, error, row_hash):
+            write_event(event="failed" if error else "sent", index=original_df_index, email=recipient_email, error=error)
+            heartbeat()
+            if os.path.exists(stop_path):
+                sender.stop()
+
+        def on_finished(failed_data):
+            fatal_errors.extend(item for item in failed_data if item[0] == -1)
+
+        sender.log_signal.connect(lambda message, level: write_event(event="log", message=message, level=level))
+        sender.row_result.connect(on_row_result)
+        sender.finished_signal.connect(on_finished)
+        sender.run() # Runs in this process's main thread; no Qt event loop needed
+        for _, recipient_email, error in fatal_errors:
+            write_event(event="failed", index=-1, email=recipient_email, error=error)
+    open(os.path.join(spool_dir, shard_name + ".done"), "w").close()
+    return not fatal_errors, sender.server
+
+def run_spool_worker(spool_dir, app_password):
+    """Sends claimed shards from a spool directory until none are left. Returns the number of shards processed."""
+    with open(os.path.join(spool_dir, "campaign.json"), encoding="utf-8") as campaign_file:
+        campaign = json.load(campaign_file)
+    campaign_id = campaign["campaign_id"]
+    slot_path = _claim_worker_slot(spool_dir, campaign_id, campaign["worker_slots"])
+    if slot_path is None:
+        return 0
+    send_rate = campaign["send_rate"] / campaign["worker_slots"]
+    shards_processed = 0
+    server = None
+    try:
+        while not os.path.exists(spool_stop_path(spool_dir, campaign_id)):
+            shard_name = _claim_next_shard(spool_dir, campaign_id)
+            if shard_name is None:
+                break
+            shards_processed += 1
+            shard_ok, server = _send_spool_shard(spool_dir, shard_name, campaign, app_password, send_rate, server, slot_path)
+            if not shard_ok:
+                break # Authentication/connection failed; other shards would fail the same way
+    finally:
+        close_smtp_session(server)
+        try:
+            os.remove(slot_path)
+        except OSError:
+            pass
+    return shards_processed
+
+def spool_worker_main(spool_dir):
+    app_password = os.environ.get("GSEND_APP_PASSWORD") or getpass.getpass("Gmail App Password: ")
+    print(f"Joining campaign spool: {spool_dir}")
+    shards_processed = run_spool_worker(spool_dir, app_password.replace(" ", ""))
+    print(f"Spool worker finished. Shards processed: {shards_processed}")
+
+class ShardedCampaignRunner(EmailSenderThread):
+    """
+    Drop-in replacement for EmailSenderThread on large sheets: shards the batch into a
+    spool directory, sends it from worker processes (each with its own SMTP connection
+    and share of send_rate), and merges their events back into the same signals.
+    """
+
+    def __init__(self, *args, process_count=SHARD_PROCESSES, spool_dir=None,
+                 worker_slots=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.process_count = process_count
+        self.spool_dir = spool_dir
+        self.worker_slots = worker_slots if worker_slots else process_count
+
+    def enqueue_rows(self, df_rows, row_hashes=None):
+        return False # Shards are fixed once written to the spool
+
+    def run(self):
+        total_emails = len(self.df_batch)
+        self.batch_failed_data = []
+        start_time = time.time()
+        spool_dir = self.spool_dir or tempfile.mkdtemp(prefix="gsend-spool-")
+        campaign = {
+            "email_column": self.email_column,
+            "sender_email": self.sender_email,
+            "subject_template": self.subject_template,
+            "body_template_html": self.body_template_html,
+            "attachment_paths": [os.path.abspath(path) for path in self.attachment_paths],
+            "send_rate": self.send_rate,
+            "worker_slots": max(self.worker_slots, self.process_count),
+            "campaign_id": new_campaign_id()
+        }
+        stop_path = spool_stop_path(spool_dir, campaign["campaign_id"])
+        try:
+            # At least one shard per worker slot, so no slot's share of the rate sits idle
+            shard_rows = min(SHARD_ROWS, max(1, math.ceil(total_emails / campaign["worker_slots"])))
+            shard_names = write_campaign_spool(spool_dir, self.df_batch, campaign, shard_rows)
+        except Exception as e:
+            spool_err_msg = f"Could not write campaign spool: {str(e)}"
+            self.log_signal.emit(spool_err_msg, "error")
+            self.progress_update.emit(0, 0, total_emails, spool_err_msg, "Error")
+            self.finished_signal.emit([(-1, "N/A", spool_err_msg)])
+            return
+
+        self.log_signal.emit(f"Sending {total_emails} rows as {len(shard_names)} shard(s) with {self.process_count} worker process(es). Spool: {spool_dir}", "info")
+        mp_context = multiprocessing.get_context("spawn")
+        workers = [mp_context.Process(target=run_spool_worker, args=(spool_dir, self.app_password), daemon=True)
+                   for _ in range(self.process_count)]
+        for worker in workers:
+            worker.start()
+
+        event_offsets = {shard_name: 0 for shard_name in shard_names}
+        sent_count = 0
+        failed_count = 0
+        reported_indices = set()
+        last_lease_check = time.monotonic()
+        while True:
+            all_done = all(os.path.exists(os.path.join(spool_dir, shard_name + ".done")) for shard_name in shard_names)
+            last_email = None
+            for shard_name in shard_names:
+                for event in self._read_new_events(spool_dir, shard_name, event_offsets):
+                    if event["event"] == "log":
+                        self.log_signal.emit(f"[{shard_name}] {event['message']}", event["level"])
+                    elif event["event"] == "sent":
+                        sent_count += 1
+                        reported_indices.add(event["index"])
+                        last_email = event["email"]
+                        self.row_result.emit(event["index"], event["email"], "", self._row_hash(event["index"]))
+                    elif event["index"] == -1:
+                        self.batch_failed_data.append((-1, event["email"], event["error"]))
+                        self.stop()
+                    else:
+                        failed_count += 1
+                        reported_indices.add(event["index"])
+                        self.batch_failed_data.append((event["index"], event["email"], event["error"]))
+                        self.row_result.emit(event["index"], event["email"], event["error"], self._row_hash(event["index"]))
+                        last_email = f"{event['email']} (Failed: {event['error'][:30]}...)"
+            if last_email is not None:
+                self.progress_update.emit(sent_count, failed_count, total_emails, last_email, self._calculate_eta(start_time, sent_count + failed_count, total_emails))
+            if all_done:
+                break
+            if not self.is_running:
+                open(stop_path, "w").close()
+            elif time.monotonic() - last_lease_check >= SPOOL_HEARTBEAT_INTERVAL:
+                last_lease_check = time.monotonic()
+                released = release_stale_claims(spool_dir, campaign["campaign_id"])
+                if released:
+                    self.log_signal.emit(f"Worker stopped responding; handed back shard(s): {', '.join(released)}", "warning")
+                    if not any(worker.is_alive() for worker in workers):
+                        workers.append(mp_context.Process(target=run_spool_worker, args=(spool_dir, self.app_password), daemon=True))
+                        workers[-1].start()
+            if not any(worker.is_alive() for worker in workers) and (not self.is_running or self.spool_dir is None):
+                break
+            time.sleep(SPOOL_POLL_INTERVAL)
+
+        open(stop_path, "w").close()
+        for worker in workers:
+            worker.join(timeout=5)
+        unfinished = [shard_name for shard_name in shard_names if not os.path.exists(os.path.join(spool_dir, shard_name + ".done"))]
+        if unfinished and self.is_running:
+            # Rows no worker reported on are failed like any other row, so Retry picks them up
+            unsent = self.df_batch[~self.df_batch.index.isin(reported_indices)]
+            unfinished_msg = f"{len(unfinished)} shard(s) were not completed by any worker."
+            self.log_signal.emit(f"{unfinished_msg} {len(unsent)} unsent row(s) marked as failed.", "error")
+            recipient_emails = unsent[self.email_column].fillna("").astype(str).str.strip() if self.email_column in unsent else pd.Series("", index=unsent.index)
+            for original_df_index, recipient_email in recipient_emails.items():
+                failed_count += 1
+                self.batch_failed_data.append((original_df_index, recipient_email, "Not sent: its shard was not completed"))
+                self.row_result.emit(original_df_index, recipient_email, "Not sent: its shard was not completed", self._row_hash(original_df_index))
+            if len(unsent):
+                self.progress_update.emit(sent_count, failed_count, total_emails, f"{len(unsent)} row(s) not sent", self._calculate_eta(start_time, sent_count + failed_count, total_emails))
+        if self.spool_dir is None:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+        self.finished_signal.emit(self.batch_failed_data)
+
+    def _row_hash(self, original_df_index):
+        if self.row_hashes is None or original_df_index not in self.row_hashes.index:
+            return None
+        return int(self.row_hashes.loc[original_df_index])
+
+    def _read_new_events(self, spool_dir, shard_name, event_offsets):
+        events_path = os.path.join(spool_dir, shard_name + ".events.jsonl")
+        if not os.path.exists(events_path):
+            return []
+        with open(events_path, "rb") as events_file:
+            events_file.seek(event_offsets[shard_name])
+            data = events_file.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        event_offsets[shard_name] += len(complete)
+        return [json.loads(line) for line in complete.decode("utf-8").splitlines() if line.strip()]
+
 class BulkEmailerApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -185,11 +1037,34 @@ class BulkEmailerApp(QMainWindow):
         self.attachment_paths = []
         self.settings_verified_for_bulk = False
         self.is_sending_sample = False # Only one type of sample send now
+        self.warm_smtp_session = None # Authenticated session from the last successful test send
+        self.send_rate = DEFAULT_SEND_RATE
+        self.shard_processes = SHARD_PROCESSES
+        self.session_keepalive_timer = QTimer(self)
+        self.session_keepalive_timer.setInterval(SESSION_KEEPALIVE_MS)
+        self.session_keepalive_timer.timeout.connect(self.keep_warm_session_alive)
+        self.excel_file_path = None
+        self.row_hashes = None # Content hash per row of self.df
+        self.sent_row_hashes = set() # Loaded from / appended to the workbook's send history
+        self.send_history_writable = True # Cleared after the first failed write, so a read-only folder warns once
+        self.inflight_row_hashes = set() # Hashes of rows handed to the running bulk send
+        self.pending_row_hashes = set() # Hashes of new/changed rows waiting for a send to pick them up
+        self.run_failures = [] # (row hash, email, reason) reported by the running bulk send
+        self.watch_reload_deferred = False # Column change seen mid-send; reload once the send finishes
+        self.file_watcher = QFileSystemWatcher(self)
+        self.file_watcher.fileChanged.connect(self.on_watched_file_changed)
+        self.watch_reload_timer = QTimer(self)
+        self.watch_reload_timer.setSingleShot(True)
+        self.watch_reload_timer.setInterval(WATCH_DEBOUNCE_MS)
+        self.watch_reload_timer.timeout.connect(self.reload_watched_file)
         # self.sample_type = "" # No longer needed as there's only one way to test
 
         self.tooltips = {
             "excel_browse": "Click to select an Excel file (.xlsx, .xls) containing recipient data.",
             "email_column": "Select the column from your Excel sheet that contains the email addresses.",
+            "watch_file": ("Watch the Excel file for changes. When it is saved, only rows that are new or changed "
+                           "since the last load are queued, and bulk sends skip rows already sent. Every bulk send "
+                           "records sent rows in <workbook>.gsend-history next to the workbook, even when this is off."),
             "sender_email": "Your full Gmail address (e.g., your.name@gmail.com).",
             "app_password": ("Your 16-character Gmail App Password. Spaces will be automatically removed. "
                              "Generate this from your Google Account settings if 2-Step Verification is ON. "
@@ -241,6 +1116,10 @@ class BulkEmailerApp(QMainWindow):
         self.email_column_combo.setToolTip(self.tooltips["email_column"])
         email_col_layout.addWidget(self.email_column_combo)
         file_group_layout.addLayout(email_col_layout)
+        self.watch_file_checkbox = QCheckBox("Watch file and send new/changed rows")
+        self.watch_file_checkbox.setToolTip(self.tooltips["watch_file"])
+        self.watch_file_checkbox.toggled.connect(self.update_file_watch)
+        file_group_layout.addWidget(self.watch_file_checkbox)
         file_group.setLayout(file_group_layout)
         left_panel_layout.addWidget(file_group)
 
@@ -456,16 +1335,41 @@ class BulkEmailerApp(QMainWindow):
                 self.progress_bar.setMaximum(100)
                 self.progress_bar.setValue(0)
 
-        self.email_sender_thread = EmailSenderThread(
+        sender_class = EmailSenderThread
+        if is_sample_send:
+            self.close_warm_session()
+            sender_options = {"probe_trials": PROBE_TRIALS, "keep_session": True}
+        elif len(dataframe_to_send) >= SHARDING_MIN_ROWS and (self.shard_processes > 1 or SPOOL_DIR):
+            self.close_warm_session() # Worker processes open their own connections
+            sender_class = ShardedCampaignRunner
+            try:
+                worker_slots = spool_worker_slots()
+            except ValueError as e:
+                worker_slots = None
+                self.log_message(f"Ignoring {SPOOL_WORKER_SLOTS_ENV} ({e}); using {self.shard_processes} local worker slot(s).", "warning")
+            sender_options = {"process_count": self.shard_processes, "spool_dir": SPOOL_DIR, "worker_slots": worker_slots}
+        else:
+            sender_options = {"server": self.take_warm_session()}
+        track_rows = not is_sample_send and self.row_hashes is not None
+        if track_rows:
+            sender_options["row_hashes"] = self.row_hashes.reindex(dataframe_to_send.index)
+        self.email_sender_thread = sender_class(
             df_batch=dataframe_to_send,
             email_column=email_column if not is_sample_send else 'EmailTo',
             sender_email=sender_email,
             app_password=app_password,
             subject_template=subject_template,
             body_template_html=body_template_html,
-            attachment_paths=self.attachment_paths
+            attachment_paths=self.attachment_paths,
+            send_rate=self.send_rate,
+            **sender_options
         )
         self.email_sender_thread.log_signal.connect(self.log_message)
+        self.email_sender_thread.probe_signal.connect(self.apply_probe_results)
+        if track_rows:
+            self.inflight_row_hashes = set(map(int, sender_options["row_hashes"]))
+            self.run_failures = []
+            self.email_sender_thread.row_result.connect(self.record_row_result)
         self.email_sender_thread.progress_update.connect(self.update_progress)
         self.email_sender_thread.finished_signal.connect(self.on_sending_finished)
         self.email_sender_thread.start()
@@ -502,9 +1406,17 @@ class BulkEmailerApp(QMainWindow):
         if self.df is None:
             QMessageBox.warning(self, "Input Error", "Please load an Excel file first.")
             return
+        dataframe_to_send = self.df.copy()
+        if self.watch_file_checkbox.isChecked() and self.row_hashes is not None:
+            dataframe_to_send = self.df[~self.row_hashes.isin(self.sent_row_hashes)].copy()
+            if dataframe_to_send.empty:
+                QMessageBox.information(self, "No New Rows", "All rows in the watched file have already been sent.")
+                return
+            self.log_message(f"Watch mode: sending {len(dataframe_to_send)} row(s) not yet sent.")
+        self.pending_row_hashes = set()
         self.all_failed_data = [] 
         self.retry_button.setEnabled(False)
-        if not self._prepare_and_start_sending(self.df.copy()):
+        if not self._prepare_and_start_sending(dataframe_to_send):
             # self.send_smtp_verify_button.setEnabled(True) # Button removed
             self.send_template_test_button.setEnabled(True)
             self.browse_button.setEnabled(True)
@@ -534,28 +1446,154 @@ class BulkEmailerApp(QMainWindow):
     def browse_file(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Open Excel File", "", "Excel Files (*.xlsx *.xls)")
         if file_path:
-            self.file_path_label.setText(os.path.basename(file_path))
-            self.log_message(f"Selected file: {file_path}")
-            try:
-                self.df = pd.read_excel(file_path)
-                self.df.columns = [str(col).strip() for col in self.df.columns]
-                self.email_column_combo.clear()
-                self.email_column_combo.addItems(self.df.columns)
-                self.log_message(f"Loaded {len(self.df)} rows. Columns: {', '.join(self.df.columns)}. Select email column.")
-                common_email_cols = ['email', 'e-mail', 'email address']
-                for i, col_name in enumerate(self.df.columns):
-                    if col_name.lower() in common_email_cols:
-                        self.email_column_combo.setCurrentIndex(i)
-                        break
-                self.reset_stats_for_new_file()
-                self.reset_settings_verification()
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to load Excel file: {e}")
-                self.log_message(f"Error loading Excel: {e}", "error")
-                self.df = None
-                self.file_path_label.setText("No Excel file selected.")
-                self.email_column_combo.clear()
-                self.reset_settings_verification()
+            self.load_excel_file(file_path)
+
+    def load_excel_file(self, file_path):
+        self.file_path_label.setText(os.path.basename(file_path))
+        self.log_message(f"Selected file: {file_path}")
+        try:
+            self.df = read_recipient_sheet(file_path)
+            self.email_column_combo.clear()
+            self.email_column_combo.addItems(self.df.columns)
+            self.log_message(f"Loaded {len(self.df)} rows. Columns: {', '.join(self.df.columns)}. Select email column.")
+            common_email_cols = ['email', 'e-mail', 'email address']
+            for i, col_name in enumerate(self.df.columns):
+                if col_name.lower() in common_email_cols:
+                    self.email_column_combo.setCurrentIndex(i)
+                    break
+            self.reset_stats_for_new_file()
+            self.reset_settings_verification()
+            self.excel_file_path = file_path
+            self.row_hashes = row_content_hashes(self.df)
+            self.sent_row_hashes = load_send_history(file_path)
+            self.send_history_writable = True
+            self.pending_row_hashes = set()
+            self.watch_reload_deferred = False
+            already_sent = int(self.row_hashes.isin(self.sent_row_hashes).sum())
+            if already_sent:
+                self.log_message(f"Send history: {already_sent} of {len(self.df)} rows were already sent from this file.")
+            self.update_file_watch()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to load Excel file: {e}")
+            self.log_message(f"Error loading Excel: {e}", "error")
+            self.df = None
+            self.excel_file_path = None
+            self.row_hashes = None
+            self.file_path_label.setText("No Excel file selected.")
+            self.email_column_combo.clear()
+            self.reset_settings_verification()
+            self.update_file_watch()
+
+    def update_file_watch(self):
+        if self.file_watcher.files():
+            self.file_watcher.removePaths(self.file_watcher.files())
+        if self.watch_file_checkbox.isChecked() and self.excel_file_path:
+            self.file_watcher.addPath(self.excel_file_path)
+            self.log_message(f"Watching {os.path.basename(self.excel_file_path)} for new or changed rows.")
+
+    def on_watched_file_changed(self, path):
+        self.watch_reload_timer.start() # Restarted on every write so a save in progress is read once
+
+    def reload_watched_file(self):
+        file_path = self.excel_file_path
+        if not file_path or not self.watch_file_checkbox.isChecked():
+            return
+        if file_path not in self.file_watcher.files() and os.path.exists(file_path):
+            self.file_watcher.addPath(file_path) # Editors that save by replacing the file drop the watch
+        try:
+            new_df = read_recipient_sheet(file_path)
+        except Exception as e:
+            self.log_message(f"Could not reload watched file: {e}", "warning")
+            return
+        if self.df is None or list(new_df.columns) != list(self.df.columns):
+            if self.email_sender_thread is not None:
+                if not self.watch_reload_deferred:
+                    self.log_message("Columns changed in the watched file. It will be reloaded when the current send finishes.", "warning")
+                self.watch_reload_deferred = True
+                return
+            self.log_message("Columns changed in the watched file. Reloading it as a new file.", "warning")
+            self.load_excel_file(file_path)
+            return
+
+        old_row_hashes = self.row_hashes
+        self.df = new_df
+        self.row_hashes = row_content_hashes(new_df)
+        self.rebase_retry_queue(old_row_hashes)
+        # Only rows added or edited since the last load count; failed rows wait for Retry
+        failed_hashes = {int(self.row_hashes.loc[idx]) for idx, _, _ in self.all_failed_data}
+        failed_hashes.update(row_hash for row_hash, _, _ in self.run_failures)
+        known_hashes = set(map(int, old_row_hashes)) | self.sent_row_hashes | self.inflight_row_hashes | failed_hashes
+        changed_rows = new_df[~self.row_hashes.isin(known_hashes)]
+        if changed_rows.empty:
+            self.log_message("Watched file changed: no new or changed rows.")
+            return
+        self.log_message(f"Watched file changed: {len(changed_rows)} new or changed row(s).")
+        self.queue_watched_rows(changed_rows)
+
+    def queue_watched_rows(self, rows):
+        thread = self.email_sender_thread
+        row_hashes = self.row_hashes.loc[rows.index]
+        hash_set = set(map(int, row_hashes))
+        if thread is not None and thread.isRunning() and not self.is_sending_sample and thread.enqueue_rows(rows, row_hashes):
+            self.inflight_row_hashes |= hash_set
+            self.pending_row_hashes -= hash_set
+            self.log_message(f"Queued {len(rows)} row(s) on the running send.")
+            return
+        self.pending_row_hashes |= hash_set
+        if thread is None and self.settings_verified_for_bulk:
+            self.send_pending_watch_rows()
+        else:
+            self.log_message(f"{len(rows)} row(s) waiting. They will be sent with the next bulk send.", "warning")
+
+    def send_pending_watch_rows(self):
+        if not self.pending_row_hashes or self.email_sender_thread is not None or not self.settings_verified_for_bulk:
+            return
+        # Rows are looked up by content, so edits made while they waited don't misplace them
+        pending = self.row_hashes.isin(self.pending_row_hashes - self.sent_row_hashes)
+        rows = self.df[pending.to_numpy()]
+        waiting = self.pending_row_hashes
+        self.pending_row_hashes = set()
+        if rows.empty:
+            return
+        if not self._prepare_and_start_sending(rows.copy()):
+            self.pending_row_hashes = waiting
+            self.send_template_test_button.setEnabled(True)
+            self.browse_button.setEnabled(True)
+            self.send_button.setEnabled(self.settings_verified_for_bulk)
+
+    def record_row_result(self, original_df_index, recipient_email, error, row_hash):
+        if row_hash is None:
+            return
+        self.inflight_row_hashes.discard(row_hash)
+        if error:
+            self.run_failures.append((row_hash, recipient_email, error))
+            return
+        if not self.excel_file_path:
+            return
+        self.sent_row_hashes.add(row_hash)
+        if not self.send_history_writable:
+            return
+        try:
+            append_send_history(self.excel_file_path, [row_hash])
+        except OSError as e:
+            self.send_history_writable = False
+            self.log_message(f"Could not update send history, so it will not be written for this file: {e}", "warning")
+
+    def failures_at_current_rows(self, failures):
+        """Maps (row hash, email, reason) failures onto self.df's index, dropping rows that were edited, removed or since sent."""
+        first_rows = self.row_hashes[~self.row_hashes.duplicated()]
+        index_by_hash = dict(zip(map(int, first_rows), first_rows.index))
+        return [(index_by_hash[row_hash], email, reason) for row_hash, email, reason in failures
+                if row_hash in index_by_hash and row_hash not in self.sent_row_hashes]
+
+    def rebase_retry_queue(self, old_row_hashes):
+        if not self.all_failed_data or old_row_hashes is None:
+            return
+        failures = [(int(old_row_hashes.loc[idx]), email, reason) for idx, email, reason in self.all_failed_data
+                    if idx in old_row_hashes.index]
+        self.all_failed_data = self.failures_at_current_rows(failures)
+        if self.email_sender_thread is None:
+            self.retry_button.setEnabled(self.settings_verified_for_bulk and bool(self.all_failed_data))
 
     def reset_stats_for_new_file(self):
         self.progress_bar.setMaximum(100) 
@@ -595,8 +1633,35 @@ class BulkEmailerApp(QMainWindow):
         self.status_label.setText(f"Status: {prefix}Processing {current_email_info} ({sent+failed}/{total})")
         self.eta_label.setText(f"ETA: {prefix}{eta_str}")
 
+    def apply_probe_results(self, probe):
+        self.send_rate = probe["send_rate"]
+        self.shard_processes = probe["connections"]
+        message_ms = f"{probe['message'] * 1000:.0f} ms" if probe["message"] else "n/a"
+        self.log_message(f"Connection probe: connect {probe['connect'] * 1000:.0f} ms, TLS {probe['tls'] * 1000:.0f} ms, "
+                         f"AUTH {probe['auth'] * 1000:.0f} ms, round trip {probe['round_trip'] * 1000:.0f} ms, message {message_ms}.")
+        self.log_message(f"Send settings tuned: {self.shard_processes} connection(s) for large sheets, up to {self.send_rate} emails/sec.")
+
+    def take_warm_session(self):
+        server = self.warm_smtp_session
+        self.warm_smtp_session = None
+        self.session_keepalive_timer.stop()
+        return server
+
+    def close_warm_session(self):
+        close_smtp_session(self.take_warm_session())
+
+    def keep_warm_session_alive(self):
+        if self.warm_smtp_session is None:
+            return
+        try:
+            self.warm_smtp_session.noop()
+        except (smtplib.SMTPException, OSError):
+            self.warm_smtp_session.close()
+            self.take_warm_session() # Bulk send will open a fresh session
+
     def reset_settings_verification(self):
         self.settings_verified_for_bulk = False
+        self.close_warm_session()
         self.send_button.setEnabled(False)
         self.retry_button.setEnabled(False) 
         self.status_label.setText("Status: Settings changed. Please test email & verify settings.")
@@ -632,6 +1697,9 @@ class BulkEmailerApp(QMainWindow):
         # self.send_smtp_verify_button.setEnabled(True) # Button removed
         self.send_template_test_button.setEnabled(True)
         self.browse_button.setEnabled(True)
+        if self.watch_reload_deferred:
+            self.watch_reload_deferred = False
+            QTimer.singleShot(0, self.reload_watched_file)
 
     def handle_sample_mail_result(self, failed_data): # No longer needs sample_type
         self.is_sending_sample = False
@@ -645,6 +1713,9 @@ class BulkEmailerApp(QMainWindow):
             self.retry_button.setEnabled(self.settings_verified_for_bulk and bool(self.all_failed_data))
             msg_title = "Test Email Success"
             msg_text = "Test email sent successfully! Settings verified for bulk send."
+            if self.email_sender_thread and self.email_sender_thread.server:
+                self.warm_smtp_session = self.email_sender_thread.server
+                self.session_keepalive_timer.start()
             self.status_label.setText(f"Status: {msg_title}. Ready for bulk send.")
             self.log_message("Test email successful. Settings verified.", "info")
             QMessageBox.information(self, msg_title, msg_text)
@@ -660,6 +1731,8 @@ class BulkEmailerApp(QMainWindow):
             else: error_msg += "Unknown error during test send."
             self.log_message(error_msg, "error")
             self.status_label.setText("Status: Test Email Failed. Bulk send disabled.")
+            if self.email_sender_thread:
+                close_smtp_session(self.email_sender_thread.server)
             QMessageBox.critical(self, "Test Email Failed", error_msg + "\nPlease check settings and details.")
         
         if hasattr(self, 'email_sender_thread'):
@@ -687,6 +1760,10 @@ class BulkEmailerApp(QMainWindow):
         self.status_label.setText(f"Status: Bulk Send Completed. Sent: {final_sent}, Failed: {final_failed}")
         self.log_message(f"Bulk email process finished. Successfully sent: {final_sent}, Failed: {final_failed}")
 
+        if self.run_failures:
+            # Indices from the thread may predate a watch reload; the row hashes don't
+            failed_data_from_thread = self.failures_at_current_rows(self.run_failures)
+            self.run_failures = []
         for original_idx, email, reason in failed_data_from_thread:
             if original_idx != -1:
                 if not any(existing_item[0] == original_idx for existing_item in self.all_failed_data):
@@ -701,8 +1778,15 @@ class BulkEmailerApp(QMainWindow):
                  self.log_message("All emails in this batch sent successfully.", "info")
         
         self.send_button.setEnabled(self.settings_verified_for_bulk)
+        if self.email_sender_thread is not None:
+            for _, leftover_hashes in self.email_sender_thread.take_queued_rows():
+                if leftover_hashes is not None:
+                    self.pending_row_hashes.update(map(int, leftover_hashes))
+        self.inflight_row_hashes = set()
         if hasattr(self, 'email_sender_thread'):
             self.email_sender_thread = None
+        if self.pending_row_hashes and self.watch_file_checkbox.isChecked():
+            QTimer.singleShot(0, self.send_pending_watch_rows) # After on_sending_finished restores the buttons
 
     def closeEvent(self, event):
         if hasattr(self, 'email_sender_thread') and self.email_sender_thread and self.email_sender_thread.isRunning():
@@ -713,13 +1797,19 @@ class BulkEmailerApp(QMainWindow):
                 if self.email_sender_thread:
                     self.email_sender_thread.stop()
                     self.email_sender_thread.wait(2000) 
+                self.close_warm_session()
                 event.accept()
             else:
                 event.ignore()
         else:
+            self.close_warm_session()
             event.accept()
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    if len(sys.argv) == 3 and sys.argv[1] == '--spool-worker':
+        spool_worker_main(sys.argv[2])
+        sys.exit(0)
     app = QApplication(sys.argv)
     main_win = BulkEmailerApp()
     main_win.show()
@@ -0,0 +1,173 @@
+import queue
+import socketserver
+import threading
+import time
+import smtplib
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.mime.base import MIMEBase
+from email import encoders
+
+from mailer import PipeliningSMTP, message_to_smtp_bytes
+
+# --- Configuration ---
+SIMULATED_RTT = 0.1 # Seconds between a request arriving and its replies going out
+MESSAGES_PER_RUN = 20
+ATTACHMENT_SIZE = 256 * 1024
+
+class LatencySMTPHandler(socketserver.BaseRequestHandler):
+    """
+    Minimal SMTP sink that delivers each batch of replies SIMULATED_RTT after the
+    request bytes arrived, so every client round trip costs one RTT and pipelined
+    commands share one.
+    """
+
+    def reply(self, replies, line):
+        replies.append(line.encode('ascii') + b"\r\n")
+
+    def delayed_writer(self, outgoing):
+        while True:
+            due, payload = outgoing.get()
+            if payload is None:
+                return
+            time.sleep(max(0.0, due - time.monotonic()))
+            try:
+                self.request.sendall(payload)
+            except OSError:
+                return
+
+    def handle(self):
+        outgoing = queue.Queue()
+        writer = threading.Thread(target=self.delayed_writer, args=(outgoing,), daemon=True)
+        writer.start()
+        try:
+            self.serve_session(outgoing)
+        finally:
+            outgoing.put((0, None))
+            writer.join()
+
+    def serve_session(self, outgoing):
+        sock = self.request
+        extensions = self.server.extensions
+        sock.sendall(b"220 localhost latency-test ESMTP\r\n")
+        buffer = b""
+        in_data = False
+        bdat_remaining = 0
+        bdat_last = False
+        while True:
+            try:
+                received = sock.recv(65536)
+            except OSError:
+                return
+            if not received:
+                return
+            arrived = time.monotonic()
+            buffer += received
+            replies = []
+            while buffer:
+                if bdat_remaining:
+                    taken = min(bdat_remaining, len(buffer))
+                    buffer = buffer[taken:]
+                    bdat_remaining -= taken
+                    if bdat_remaining == 0:
+                        self.reply(replies, "250 Message accepted" if bdat_last else "250 Chunk accepted")
+                    continue
+                if in_data:
+                    end = buffer.find(b"\r\n.\r\n")
+                    if buffer.startswith(b".\r\n"):
+                        end, skip = 0, 3
+                    elif end == -1:
+                        break
+                    else:
+                        skip = end + 5
+                    buffer = buffer[skip:]
+                    in_data = False
+                    self.reply(replies, "250 Message accepted")
+                    continue
+                end = buffer.find(b"\r\n")
+                if end == -1:
+                    break
+                line = buffer[:end].decode('ascii', 'replace')
+                buffer = buffer[end + 2:]
+                verb = line.split(" ", 1)[0].upper()
+                if verb in ("EHLO", "HELO"):
+                    lines = ["localhost"] + extensions
+                    for ext in lines[:-1]:
+                        self.reply(replies, f"250-{ext}")
+                    self.reply(replies, f"250 {lines[-1]}")
+                elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                    self.reply(replies, "250 OK")
+                elif verb == "DATA":
+                    in_data = True
+                    self.reply(replies, "354 End data with <CR><LF>.<CR><LF>")
+                elif verb == "BDAT":
+                    args = line.split()
+                    bdat_remaining = int(args[1])
+                    bdat_last = len(args) > 2 and args[2].upper() == "LAST"
+                    if bdat_remaining == 0:
+                        self.reply(replies, "250 Message accepted")
+                elif verb == "QUIT":
+                    self.reply(replies, "221 Bye")
+                    outgoing.put((arrived + SIMULATED_RTT, b"".join(replies)))
+                    return
+                else:
+                    self.reply(replies, "502 Command not implemented")
+            if replies:
+                outgoing.put((arrived + SIMULATED_RTT, b"".join(replies)))
+
+class LatencySMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, extensions):
+        super().__init__(("127.0.0.1", 0), LatencySMTPHandler)
+        self.extensions = extensions
+
+def build_message(with_attachment):
+    msg = MIMEMultipart()
+    msg['From'] = "sender@example.com"
+    msg['To'] = "recipient@example.com"
+    msg['Subject'] = "Latency test for Zoë – héllo" # Non-ASCII headers must survive serialization
+    msg.attach(MIMEText("<p>Hello from the latency bench.</p>\n<p>.leading dot line</p>", 'html', 'utf-8'))
+    if with_attachment:
+        part = MIMEBase("application", "octet-stream")
+        part.set_payload(bytes(range(256)) * (ATTACHMENT_SIZE // 256))
+        encoders.encode_base64(part)
+        part.add_header('Content-Disposition', 'attachment', filename="payload.bin")
+        msg.attach(part)
+    return message_to_smtp_bytes(msg)
+
+def time_run(extensions, client_class, msg_bytes):
+    server = LatencySMTPServer(extensions)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = client_class(*server.server_address)
+        client.ehlo()
+        start = time.perf_counter()
+        for _ in range(MESSAGES_PER_RUN):
+            if isinstance(client, PipeliningSMTP):
+                client.send_message_bytes("sender@example.com", "recipient@example.com", msg_bytes)
+            else:
+                client.sendmail("sender@example.com", "recipient@example.com", msg_bytes)
+        elapsed = time.perf_counter() - start
+        client.quit()
+        return elapsed
+    finally:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == "__main__":
+    print("--- SMTP Pipelining / Chunking Latency Bench ---")
+    print(f"Simulated RTT: {SIMULATED_RTT * 1000:.0f} ms, {MESSAGES_PER_RUN} messages per run\n")
+    small_msg = build_message(with_attachment=False)
+    large_msg = build_message(with_attachment=True)
+    runs = [
+        ("sendmail (no extensions)", [], smtplib.SMTP, small_msg),
+        ("PIPELINING, small body", ["PIPELINING"], PipeliningSMTP, small_msg),
+        ("sendmail, attachment", [], smtplib.SMTP, large_msg),
+        ("PIPELINING + DATA, attachment", ["PIPELINING"], PipeliningSMTP, large_msg),
+        ("PIPELINING + BDAT, attachment", ["PIPELINING", "CHUNKING"], PipeliningSMTP, large_msg),
+    ]
+    for label, extensions, client_class, msg_bytes in runs:
+        elapsed = time_run(extensions, client_class, msg_bytes)
+        print(f"{label:<32} {elapsed:6.2f} s  ({MESSAGES_PER_RUN / elapsed:5.1f} msg/s)")
@@ -1,4 +1,6 @@
 import smtplib
+import time
+from email.mime.text import MIMEText
 
 # --- Configuration ---
 SMTP_SERVER = 'smtp.gmail.com'
@@ -58,6 +60,52 @@ def verify_gmail_credentials(email_address, app_password):
             except Exception:
                 pass # Ignore errors on quit if connection was already problematic
 
+def time_test_send(server, email_address):
+    from mailer import message_to_smtp_bytes
+    msg = MIMEText("Connection probe from test-email.py. You can delete this message.", 'plain', 'utf-8')
+    msg['From'] = email_address
+    msg['To'] = email_address
+    msg['Subject'] = "G-Send connection probe"
+    step_start = time.perf_counter()
+    server.send_message_bytes(email_address, email_address, message_to_smtp_bytes(msg))
+    return time.perf_counter() - step_start
+
+def probe_gmail_connection(email_address, app_password, trials=None, send_test_email=False):
+    """
+    Opens several authenticated sessions with mailer.open_smtp_session and averages the
+    TCP connect, TLS handshake, AUTH and command round-trip times in seconds, plus the
+    number of connections and send rate recommended by mailer.recommend_send_settings.
+    With send_test_email, the last session also sends one message to email_address and
+    times it, as the app does with its test email, so both recommend the same settings.
+    """
+    # Imported here so the credential check above runs without the app's PyQt5/pandas/numpy
+    from mailer import (PROBE_TRIALS, close_smtp_session, estimate_message_seconds, measure_round_trip,
+                        open_smtp_session, recommend_send_settings)
+    trials = trials or PROBE_TRIALS
+    totals = {"connect": 0.0, "tls": 0.0, "auth": 0.0, "round_trip": 0.0}
+    pipelining = False
+    message_time = None
+    for trial in range(1, trials + 1):
+        server, timings = open_smtp_session(email_address, app_password)
+        try:
+            timings["round_trip"] = measure_round_trip(server)
+            pipelining = server.has_extn('pipelining')
+            if send_test_email and trial == trials:
+                message_time = time_test_send(server, email_address)
+        finally:
+            close_smtp_session(server)
+        print(f"  Session {trial}: connect {timings['connect'] * 1000:.0f} ms, TLS {timings['tls'] * 1000:.0f} ms, "
+              f"AUTH {timings['auth'] * 1000:.0f} ms, round trip {timings['round_trip'] * 1000:.0f} ms")
+        for step in totals:
+            totals[step] += timings[step]
+
+    probe = {step: total / trials for step, total in totals.items()}
+    probe["pipelining"] = pipelining
+    probe["message"] = message_time # Without it estimate_message_seconds only counts round trips
+    probe["message_estimate"] = estimate_message_seconds(probe)
+    probe.update(recommend_send_settings(probe))
+    return probe
+
 if __name__ == "__main__":
     print("--- Gmail SMTP Authentication Test ---")
     user_email = input("Enter your Gmail address: ").strip()
@@ -75,6 +123,23 @@ if __name__ == "__main__":
         if success:
             print("✅ Authentication SUCCESSFUL!")
             print("Your Gmail address and App Password are correct and can connect to Gmail's SMTP server.")
+
+            print("\n--- Connection Probe ---")
+            send_test_email = input("Send one test email to yourself to time a real send, as the app does? [y/N]: ").strip().lower() == "y"
+            try:
+                probe = probe_gmail_connection(user_email, user_app_password, send_test_email=send_test_email)
+                print(f"Average: connect {probe['connect'] * 1000:.0f} ms, TLS {probe['tls'] * 1000:.0f} ms, "
+                      f"AUTH {probe['auth'] * 1000:.0f} ms, round trip {probe['round_trip'] * 1000:.0f} ms")
+                if probe["message"]:
+                    print(f"Measured time per message on one connection: {probe['message'] * 1000:.0f} ms")
+                    print(f"Recommended: {probe['connections']} parallel connection(s), up to {probe['send_rate']} emails/sec.")
+                else:
+                    # Round trips leave out Gmail's processing time, so real sends are slower than this
+                    print(f"Time per message on one connection: at least {probe['message_estimate'] * 1000:.0f} ms (round trips only)")
+                    print(f"Recommended: at least {probe['connections']} parallel connection(s). "
+                          "The app's test send measures a real message and usually recommends more.")
+            except Exception as e:
+                print(f"Connection probe failed: {e}") # Also covers the app's dependencies not being installed
         else:
             print("❌ Authentication FAILED.")
             print(f"   Reason: {message}")